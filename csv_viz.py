@@ -1,24 +1,19 @@
 import streamlit as st
-from lida import Manager, TextGenerationConfig, llm
-from lida.datamodel import Goal
 import os
 import pandas as pd
-from PIL import Image
 import io
 import base64
+import hashlib
+import json
+import sqlite3
+from contextlib import closing
+from dataclasses import asdict
 from dotenv import load_dotenv
 from authentication import init_authentication  
-from llama_index.core.readers import SimpleDirectoryReader
-from llama_index.core import Settings
-from llama_index.llms.openai import OpenAI
-from llama_index.embeddings.openai import OpenAIEmbedding
-from llama_index.readers.file import PagedCSVReader
-from llama_index.vector_stores.faiss import FaissVectorStore
-from llama_index.core.ingestion import IngestionPipeline
-from llama_index.core import VectorStoreIndex
-import faiss
-import os
-import pandas as pd
+
+# lida, PIL and llama-index are heavy to import and only needed once a dataset
+# is being summarised, so they are imported inside the functions and blocks
+# that use them.
 
 
 load_dotenv()
@@ -34,18 +29,145 @@ if not st.session_state.authentication_status:
 
 
 EMBED_DIMENSION=3072
-Settings.llm = OpenAI(model="gpt-4o-mini")
-Settings.embed_model = OpenAIEmbedding(model="text-embedding-3-large", dimensions=EMBED_DIMENSION)
+
+
+# Configured once per server process so the OpenAI clients (and their pooled
+# connections) survive reruns instead of being rebuilt on every interaction.
+@st.cache_resource(show_spinner=False)
+def init_llama_settings():
+    from llama_index.core import Settings
+    from llama_index.embeddings.openai import OpenAIEmbedding
+    from llama_index.llms.openai import OpenAI
+    Settings.llm = OpenAI(model="gpt-4o-mini")
+    Settings.embed_model = OpenAIEmbedding(model="text-embedding-3-large", dimensions=EMBED_DIMENSION)
+    return Settings
+
+
+init_llama_settings()
 
 
 import streamlit_analytics2 as streamlit_analytics
 streamlit_analytics.start_tracking(load_from_json="streamlit_analytics_csv.json")
 
+# LLM outputs only change when the dataset or the generation settings do, so
+# they are cached across Streamlit reruns instead of being re-requested on
+# every widget interaction.
+LLM_CACHE_TTL = 24 * 60 * 60
+LLM_DISK_CACHE_PATH = os.path.join("data", ".lida_cache", "cache.sqlite")
+
+
+class DiskCache:
+    """Persistent JSON key/value store so LLM outputs survive server restarts."""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+    def _execute(self, query, params=()):
+        with closing(sqlite3.connect(self.path)) as conn, conn:
+            return conn.execute(query, params).fetchone()
+
+    def get(self, key):
+        row = self._execute("SELECT value FROM cache WHERE key = ?", (key,))
+        return json.loads(row[0]) if row else None
+
+    def set(self, key, value):
+        self._execute(
+            "INSERT OR REPLACE INTO cache (key, value) VALUES (?, ?)",
+            (key, json.dumps(value, default=str)))
+
+
+@st.cache_resource(show_spinner=False)
+def get_disk_cache():
+    return DiskCache(LLM_DISK_CACHE_PATH)
+
+
+def make_cache_key(*parts):
+    return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def hash_file(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+@st.cache_resource(show_spinner=False)
+def get_lida_manager(api_key):
+    from lida import Manager, llm
+    return Manager(text_gen=llm("openai", api_key=api_key))
+
+
+def hash_summary(summary):
+    return hashlib.sha1(json.dumps(summary, sort_keys=True, default=str).encode()).hexdigest()
+
+
+@st.cache_data(show_spinner=False, ttl=LLM_CACHE_TTL)
+def summarize_dataset(dataset_path, dataset_mtime, summary_method, model, temperature, use_cache, _api_key):
+    from lida import TextGenerationConfig
+    key = make_cache_key("summary", hash_file(dataset_path), summary_method, model, temperature)
+    summary = get_disk_cache().get(key)
+    if summary is None:
+        textgen_config = TextGenerationConfig(n=1, temperature=temperature, model=model, use_cache=use_cache)
+        summary = get_lida_manager(_api_key).summarize(
+            dataset_path,
+            summary_method=summary_method,
+            textgen_config=textgen_config)
+        get_disk_cache().set(key, summary)
+    return summary
+
+
+@st.cache_data(show_spinner=False, ttl=LLM_CACHE_TTL)
+def generate_goals(summary_key, _summary, num_goals, model, temperature, use_cache, _api_key):
+    from lida import TextGenerationConfig
+    from lida.datamodel import Goal
+    key = make_cache_key("goals", summary_key, num_goals, model, temperature)
+    cached = get_disk_cache().get(key)
+    if cached is not None:
+        return [Goal(**goal) for goal in cached]
+    textgen_config = TextGenerationConfig(n=1, temperature=temperature, model=model, use_cache=use_cache)
+    goals = get_lida_manager(_api_key).goals(_summary, n=num_goals, textgen_config=textgen_config)
+    get_disk_cache().set(key, [asdict(goal) for goal in goals])
+    return goals
+
+
+@st.cache_data(show_spinner=False, ttl=LLM_CACHE_TTL)
+def generate_visualizations(summary_key, _summary, goal_question, _goal, library, num_visualizations,
+                            model, temperature, use_cache, _api_key):
+    from lida import TextGenerationConfig
+    from lida.datamodel import ChartExecutorResponse
+    key = make_cache_key("visualize", summary_key, goal_question, library, num_visualizations, model, temperature)
+    cached = get_disk_cache().get(key)
+    if cached is not None:
+        return [ChartExecutorResponse(**chart) for chart in cached]
+    textgen_config = TextGenerationConfig(
+        n=num_visualizations, temperature=temperature,
+        model=model,
+        use_cache=use_cache)
+    visualizations = get_lida_manager(_api_key).visualize(
+        summary=_summary,
+        goal=_goal,
+        textgen_config=textgen_config,
+        library=library)
+    get_disk_cache().set(key, [asdict(chart) for chart in visualizations])
+    return visualizations
+
+
 # make data dir if it doesn't exist
 os.makedirs("data", exist_ok=True)
 CSV_DIR = "/home/s07rb2/github/D4NZ/data/csv"
 
-csv_files = [f for f in os.listdir(CSV_DIR) if f.endswith('.csv')]
+
+@st.cache_data(ttl=60)
+def list_datasets(csv_dir, dir_mtime_ns):
+    # dir_mtime_ns only keys the cache so added/removed files are picked up
+    datasets = [{"label": "Select a dataset", "url": None}]
+    for csv_file in os.listdir(csv_dir):
+        if csv_file.endswith('.csv'):
+            datasets.append({"label": os.path.splitext(csv_file)[0], "url": os.path.join(csv_dir, csv_file)})
+    return datasets
+
+
 st.set_page_config(
     page_title="CSV VIZ and Q&A",
     page_icon="📊",
@@ -96,13 +218,7 @@ if openai_key:
 
     # Handle dataset selection and upload
     # st.sidebar.write("### Choose a dataset")
-    csv_files = [f for f in os.listdir(CSV_DIR) if f.endswith('.csv')]
-
-    datasets = [{"label": "Select a dataset", "url": None}]
-    for csv_file in csv_files:
-        file_path = os.path.join(CSV_DIR, csv_file)
-        file_name = os.path.splitext(csv_file)[0]
-        datasets.append({"label": file_name, "url": file_path})
+    datasets = list_datasets(CSV_DIR, os.stat(CSV_DIR).st_mtime_ns)
 
     selected_dataset_label = st.selectbox(
         'Choose a dataset',
@@ -174,18 +290,16 @@ if openai_key:
 
 # Step 3 - Generate data summary
 if openai_key and selected_dataset and selected_method:
-    lida = Manager(text_gen=llm("openai", api_key=openai_key))
-    textgen_config = TextGenerationConfig(
-        n=1,
-        temperature=temperature,
-        model=selected_model,
-        use_cache=use_cache)
-
     # **** lida.summarize *****
-    summary = lida.summarize(
+    summary = summarize_dataset(
         selected_dataset,
-        summary_method=selected_method,
-        textgen_config=textgen_config)
+        os.path.getmtime(selected_dataset),
+        selected_method,
+        selected_model,
+        temperature,
+        use_cache,
+        openai_key)
+    summary_key = hash_summary(summary)
 
     with st.expander("Summary of the Dataset"):
         if "fields" in summary:
@@ -212,7 +326,7 @@ if openai_key and selected_dataset and selected_method:
         num_goals = 10
         
         # **** lida.goals *****
-        goals = lida.goals(summary, n=num_goals, textgen_config=textgen_config)
+        goals = generate_goals(summary_key, summary, num_goals, selected_model, temperature, use_cache, openai_key)
         st.write(f"## Question ({len(goals)})")
 
         default_goal = goals[0].question
@@ -225,6 +339,7 @@ if openai_key and selected_dataset and selected_method:
         if selected_option == "Write your own question...":
             user_goal = st.text_input("Enter your question", value=default_goal)
             if user_goal:
+                from lida.datamodel import Goal
                 new_goal = Goal(question=user_goal, visualization=user_goal, rationale="")
                 goals.append(new_goal)
                 goal_questions.append(user_goal)
@@ -244,17 +359,19 @@ if openai_key and selected_dataset and selected_method:
             st.write("## Visualizations")
 
             num_visualizations = 2
-            textgen_config = TextGenerationConfig(
-                n=num_visualizations, temperature=temperature,
-                model=selected_model,
-                use_cache=use_cache)
 
             # **** lida.visualize *****
-            visualizations = lida.visualize(
-                summary=summary,
-                goal=selected_goal_object,
-                textgen_config=textgen_config,
-                library=selected_library)
+            visualizations = generate_visualizations(
+                summary_key,
+                summary,
+                selected_goal_object.question,
+                selected_goal_object,
+                selected_library,
+                num_visualizations,
+                selected_model,
+                temperature,
+                use_cache,
+                openai_key)
 
             viz_titles = [f'Visualization {i+1}' for i in range(len(visualizations))]
 
@@ -264,6 +381,7 @@ if openai_key and selected_dataset and selected_method:
 
             if selected_viz.raster:
                 
+                from PIL import Image
                 imgdata = base64.b64decode(selected_viz.raster)
                 img = Image.open(io.BytesIO(imgdata))
                 st.image(img, caption=selected_viz_title)
@@ -1,24 +1,23 @@
 import dash
-from dash import html, dcc
+from dash import html, dcc, Patch
 import plotly.graph_objects as go
 from dash.dependencies import Input, Output
 import numpy as np
 import pandas as pd
-import colorsys
+import matplotlib.colors as mcolors
+from functools import lru_cache
 
 # Initialize Dash
 app = dash.Dash(__name__)
 
 # Helper function to generate colors
+# Cached per n since every control interaction asks for the same palette;
+# a tuple is returned so the cached value cannot be mutated by callers.
+@lru_cache(maxsize=32)
 def generate_colors(n):
-    colors = []
-    for i in range(n):
-        hue = i / n
-        saturation = 0.7
-        value = 0.9
-        rgb = colorsys.hsv_to_rgb(hue, saturation, value)
-        colors.append(f'rgb({int(rgb[0]*255)}, {int(rgb[1]*255)}, {int(rgb[2]*255)})')
-    return colors
+    hsv = np.stack([np.arange(n) / n, np.full(n, 0.7), np.full(n, 0.9)], axis=1)
+    rgb = (mcolors.hsv_to_rgb(hsv) * 255).astype(np.uint8)
+    return tuple(f'rgb({r}, {g}, {b})' for r, g, b in rgb.tolist())
 
 # Sample hierarchical data
 def create_sample_data():
@@ -92,13 +91,19 @@ def create_radial_tree(df, selected_node=None):
 # Create sample data
 df = create_sample_data()
 
+# Built once at import: the base figure for the layout, and O(1) lookups for
+# the click callback instead of scanning the frame on every click.
+BASE_FIG = create_radial_tree(df)
+NAME_TO_ROW = df.drop_duplicates('name').set_index('name').to_dict('index')
+CHILD_COUNTS = df['parent'].value_counts().to_dict()
+
 # App layout
 app.layout = html.Div([
     html.Div([
         # Main visualization
         dcc.Graph(
             id='radial-tree',
-            figure=create_radial_tree(df),
+            figure=BASE_FIG,
             style={'width': '800px', 'height': '800px'}
         ),
     ], style={'display': 'flex', 'justifyContent': 'center'}),
@@ -147,42 +152,44 @@ def display_click_data(clickData):
         return "Click on a node to see its details"
     
     point = clickData['points'][0]
-    node_info = df[df['name'] == point['label']].iloc[0]
+    node_info = NAME_TO_ROW[point['label']]
     
     return html.Div([
         html.P(f"Selected Node: {point['label']}"),
         html.P(f"Value: {point['value']}"),
         html.P(f"Parent: {node_info['parent'] if node_info['parent'] else 'Root'}"),
-        html.P(f"Number of children: {len(df[df['parent'] == node_info['id']])}")
+        html.P(f"Number of children: {CHILD_COUNTS.get(node_info['id'], 0)}")
     ])
 
 # Callback for visualization controls
+# Only the trace properties the controls affect are sent back as a Patch,
+# instead of rebuilding and shipping the whole figure on every change.
 @app.callback(
     Output('radial-tree', 'figure'),
     [Input('display-options', 'value'),
-     Input('color-scheme', 'value')]
+     Input('color-scheme', 'value')],
+    prevent_initial_call=True
 )
 def update_visualization(display_options, color_scheme):
     show_values = 'show_values' in display_options
     show_path = 'show_path' in display_options
     
-    # Create updated figure
-    fig = create_radial_tree(df)
+    patched = Patch()
     
     # Update based on display options
-    if not show_values:
-        fig.update_traces(text=[''] * len(df))
+    patched['data'][0]['text'] = None if show_values else [''] * len(df)
     
     # Update color scheme
     if color_scheme == 'sequential':
         colors = [f'hsl(200, 50%, {i}%)' for i in range(20, 80, 5)]
-        fig.update_traces(marker_colors=colors[:len(df)])
     elif color_scheme == 'categorical':
         colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', 
                  '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf']
-        fig.update_traces(marker_colors=colors[:len(df)])
+    else:
+        colors = generate_colors(len(df))
+    patched['data'][0]['marker']['colors'] = list(colors[:len(df)])
     
-    return fig
+    return patched
 
 if __name__ == '__main__':
     app.run_server(debug=True)
\ No newline at end of file
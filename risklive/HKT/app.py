@@ -1,14 +1,88 @@
 from __future__ import annotations
 
-from collections import defaultdict
+import os
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
+import plotly.graph_objects as go
 
 from data_helper import DataHelper
 from hkt_algorithm import HKTAlgorithm
 
+DATASET_PATH = "dataset.csv"
+
+
+def build_tree_views(hkts, algo):
+    """Walk the HKT forest once, returning the treemap rows and tree-view lines.
+
+    The walk is an explicit depth-first stack so the lines come out in the
+    same pre-order as the nested list rendering expects.  Every node is
+    visited exactly once, so its label is built there and shared by both
+    views.
+    """
+
+    # Word ids are dense from 1, so the names are looked up by list index.
+    words = ["<refuge>"] * (max(algo.wordDS, default=0) + 1)
+    for wid, word in algo.wordDS.items():
+        words[wid] = word
+
+    treemap_data = [{"id": "root", "parent": "", "label": "", "value": 0}]
+    lines = []
+    roots = [h for h in hkts.values() if h.parent_node_id == 0]
+    stack = [(node, "root", 0) for root_hkt in reversed(roots) for node in reversed(root_hkt.nodes)]
+    while stack:
+        node, parent_id, depth = stack.pop()
+        node_id = f"node-{node.node_id}"
+        names = [words[wid] if wid < len(words) else "<refuge>" for wid in node.word_ids if wid > 0]
+        label = " ".join(names) if names else "<refuge>"
+        value = len(node.source_ids)
+        treemap_data.append({"id": node_id, "parent": parent_id, "label": label, "value": value})
+        lines.append(f"{'  ' * depth}- {label} (#{value} sources)")
+        for child in reversed(algo.children_by_parent.get(node.node_id, [])):
+            stack.extend((child_node, node_id, depth + 1) for child_node in reversed(child.nodes))
+
+    return treemap_data, lines
+
+
+@st.cache_resource(show_spinner="Loading sources…", max_entries=1)
+def get_sources(csv_path, mtime_ns):
+    """Tokenised sources for ``csv_path``; ``mtime_ns`` invalidates on file edits.
+
+    Cached separately from :func:`run_hkt` so changing only the algorithm
+    parameters does not re-read and re-tokenise the CSV.  Only the latest
+    corpus is kept, so superseded versions are released rather than held for
+    the life of the server.
+    """
+
+    return DataHelper(csv_path).load_sources()
+
+
+@st.cache_data(show_spinner="Running HKT…")
+def run_hkt(
+    csv_path,
+    mtime_ns,
+    min_threshold,
+    similarity_threshold,
+    min_sources_important,
+    min_sources_branch,
+):
+    """Load ``csv_path`` and build the HKT forest, cached per file version and parameters.
+
+    Only the rendered treemap rows, tree-view lines and stats are returned so
+    the cached value is small and picklable.
+    """
+
+    sources = get_sources(csv_path, mtime_ns)
+    algo = HKTAlgorithm(
+        minimum_threshold_against_max_word_count=min_threshold,
+        similarity_threshold=similarity_threshold,
+        minimum_sources_important=min_sources_important,
+        minimum_sources_branch=min_sources_branch,
+    )
+    hkts, stats = algo.build(sources)
+    treemap_data, lines = build_tree_views(hkts, algo)
+    return treemap_data, lines, stats
+
 
 st.set_page_config(layout="wide", page_title="NewHKT Streamlit")
 st.title("NewHKT – Streamlit Edition")
@@ -33,45 +107,14 @@ min_sources_branch = st.sidebar.number_input(
 load = st.sidebar.button("Load Data")
 
 if load:
-    helper = DataHelper("dataset.csv")
-    sources = helper.load_sources()
-    algo = HKTAlgorithm(
-        minimum_threshold_against_max_word_count=min_threshold,
-        similarity_threshold=similarity_threshold,
-        minimum_sources_important=min_sources_important,
-        minimum_sources_branch=min_sources_branch,
+    treemap_data, lines, stats = run_hkt(
+        DATASET_PATH,
+        os.stat(DATASET_PATH).st_mtime_ns,
+        min_threshold,
+        similarity_threshold,
+        min_sources_important,
+        min_sources_branch,
     )
-    hkts, stats = algo.build(sources)
-
-    children_by_parent = defaultdict(list)
-    for h in hkts.values():
-        if h.parent_node_id:
-            children_by_parent[h.parent_node_id].append(h)
-
-    def build_treemap_data(hkts, algo):
-        data = [{"id": "root", "parent": "", "label": "", "value": 0}]
-
-        def add_nodes(hkt, parent_id):
-            for node in hkt.nodes:
-                node_id = f"node-{node.node_id}"
-                names = [algo.wordDS.get(wid, "<refuge>") for wid in node.word_ids if wid > 0]
-                label = " ".join(names) if names else "<refuge>"
-                data.append(
-                    {
-                        "id": node_id,
-                        "parent": parent_id,
-                        "label": label,
-                        "value": len(node.source_ids),
-                    }
-                )
-                for child in children_by_parent.get(node.node_id, []):
-                    add_nodes(child, node_id)
-
-        for root_hkt in hkts.values():
-            if root_hkt.parent_node_id == 0:
-                add_nodes(root_hkt, "root")
-
-        return data
 
     st.success("Analysis completed")
 
@@ -89,34 +132,27 @@ if load:
 
     st.subheader("Tree View")
 
-    def build_tree_lines(hkt, depth=0):
-        lines = []
-        for node in hkt.nodes:
-            names = [algo.wordDS.get(wid, "<refuge>") for wid in node.word_ids if wid > 0]
-            label = " ".join(names) if names else "<refuge>"
-            lines.append(f"{'  ' * depth}- {label} (#{len(node.source_ids)} sources)")
-            for child in children_by_parent.get(node.node_id, []):
-                lines.extend(build_tree_lines(child, depth + 1))
-        return lines
-
-    lines = []
-    for root_hkt in hkts.values():
-        if root_hkt.parent_node_id == 0:
-            lines.extend(build_tree_lines(root_hkt))
     if lines:
         st.markdown("\n".join(lines))
     else:
         st.info("No data to display")
 
     st.subheader("Treemap")
-    treemap_data = build_treemap_data(hkts, algo)
 
     if treemap_data:
-        df = pd.DataFrame(treemap_data)
-        fig = px.treemap(
-            df, ids="id", names="label", parents="parent", values="value"
+        df = pd.DataFrame.from_records(treemap_data)
+        # Built directly as a graph object (skipping plotly.express' extra
+        # validation) with a fixed ``uirevision`` so the client keeps its
+        # layout state between reruns.  Branch values are left at the
+        # default "remainder": a node's children can share sources, so their
+        # counts may add up to more than the parent's.
+        fig = go.Figure(
+            go.Treemap(
+                ids=df["id"], labels=df["label"], parents=df["parent"], values=df["value"]
+            )
         )
-        st.plotly_chart(fig, use_container_width=True)
+        fig.update_layout(uirevision="hkt-treemap", margin=dict(t=20, l=0, r=0, b=0))
+        st.plotly_chart(fig, use_container_width=True, key="treemap")
     else:
         st.info("No data to display")
 else:
@@ -13,15 +13,21 @@ front‑end.
 from dataclasses import dataclass
 from pathlib import Path
 import re
-from typing import Dict, Iterable, List, Set
+import sys
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Set
 
 import pandas as pd
 
+try:  # DFA-based engine: linear time and much faster on bulk tokenisation
+    import re2 as _regex
+except ImportError:  # pragma: no cover - optional dependency
+    _regex = re
+
 # A reasonably comprehensive list of English stop words.  The set is based on
 # ``sklearn.feature_extraction.text.ENGLISH_STOP_WORDS`` with a few additional
 # tokens used in the original C# implementation.  Duplicates are ignored by the
 # ``set`` constructor.
-STOP_WORDS: Set[str] = {
+_RAW_STOP_WORDS: Set[str] = {
     "i",
     "me",
     "my",
@@ -164,7 +170,31 @@ STOP_WORDS: Set[str] = {
     "like",
 }
 
-TOKEN_RE = re.compile(r"\b\w+\b", re.UNICODE)
+# Interned and frozen so membership tests against freshly tokenised words can
+# short-circuit on identity, and the table cannot be mutated by accident.
+STOP_WORDS: FrozenSet[str] = frozenset(sys.intern(word) for word in _RAW_STOP_WORDS)
+
+# ``str`` patterns are Unicode-aware by default; the explicit flag is omitted so
+# the same call works for both ``re`` and ``re2``.
+TOKEN_RE = _regex.compile(r"\b\w+\b")
+
+# Hyperlinks and any character outside ``#0-9a-z`` and whitespace are blanked
+# out in a single pass.  A link is always followed by whitespace or the end of
+# the text, so replacing it with a space rather than removing it yields the
+# same tokens.  Always compiled with ``re``: RE2's ``\s`` is ASCII-only, so a
+# link followed by a non-breaking space would swallow the next word.  The
+# cleaned text only holds ``#0-9a-z`` and whitespace, where ``TOKEN_RE`` gives
+# the same tokens under either engine.
+CLEAN_RE = re.compile(r"http\S+|[^#0-9a-z\s]")
+
+# Columns read from the dataset and the dtypes they are parsed as when the
+# PyArrow CSV engine is unavailable.
+SOURCE_COLUMNS: List[str] = ["sourceId", "sourceText", "categoryId"]
+SOURCE_DTYPES: Dict[str, str] = {
+    "sourceId": "int64",
+    "sourceText": "string",
+    "categoryId": "int32",
+}
 
 
 @dataclass
@@ -180,8 +210,11 @@ class Source:
 class DataHelper:
     """Load and prepare data for the simplified 1 algorithm."""
 
-    def __init__(self, csv_path: str = "dataset.csv") -> None:
+    def __init__(
+        self, csv_path: str = "dataset.csv", chunksize: Optional[int] = None
+    ) -> None:
         self.csv_path = Path(csv_path)
+        self.chunksize = chunksize
 
     def load_sources(self) -> Dict[int, Source]:
         """Load sources from a CSV file.
@@ -191,27 +224,102 @@ class DataHelper:
         columns which mirror the fields used by the original application.
         """
 
-        df = pd.read_csv(self.csv_path)
-        sources: Dict[int, Source] = {}
+        return {source.source_id: source for source in self.iter_sources()}
+
+    def iter_sources(self) -> Iterator[Source]:
+        """Yield :class:`Source` objects as the CSV file is parsed.
 
-        for row in df.itertuples(index=False):
-            tokens = self.tokenise(str(row.sourceText))
-            sources[int(row.sourceId)] = Source(
-                source_id=int(row.sourceId),
-                text=str(row.sourceText),
-                category_id=int(row.categoryId),
+        When ``chunksize`` is set the file is read and tokenised
+        ``chunksize`` rows at a time so peak memory is bounded by the chunk
+        rather than the whole dataset.
+        """
+
+        for df in self._read_frames():
+            yield from self._frame_to_sources(df)
+
+    def _frame_to_sources(self, df: pd.DataFrame) -> List[Source]:
+        texts = df["sourceText"].fillna("")
+        token_lists = self.tokenise_series(texts)
+
+        # ``tolist`` hands back native ints/strs in one C-level pass, so no
+        # per-row casting is needed when building the sources.
+        source_ids = df["sourceId"].to_numpy().tolist()
+        category_ids = df["categoryId"].to_numpy().tolist()
+        return [
+            Source(
+                source_id=source_id,
+                text=text,
+                category_id=category_id,
                 words=tokens,
             )
-        return sources
+            for source_id, text, category_id, tokens in zip(
+                source_ids, texts.to_numpy(dtype=object).tolist(), category_ids, token_lists
+            )
+        ]
+
+    def _read_frames(self) -> Iterator[pd.DataFrame]:
+        if self.chunksize:
+            # The PyArrow engine does not support chunked reads.
+            with pd.read_csv(
+                self.csv_path,
+                engine="c",
+                usecols=SOURCE_COLUMNS,
+                dtype=SOURCE_DTYPES,
+                chunksize=self.chunksize,
+            ) as reader:
+                yield from reader
+        else:
+            yield self._read_csv()
+
+    def _read_csv(self) -> pd.DataFrame:
+        """Read the source columns, preferring the multithreaded PyArrow engine."""
+
+        try:
+            import pyarrow.csv as pacsv
+        except ImportError:  # pragma: no cover - optional dependency
+            return pd.read_csv(
+                self.csv_path, engine="c", usecols=SOURCE_COLUMNS, dtype=SOURCE_DTYPES
+            )
+
+        # Article text often holds quoted newlines, which Arrow only handles
+        # across its read blocks when told to expect them; pandas' PyArrow
+        # engine does not expose that option.
+        table = pacsv.read_csv(
+            self.csv_path,
+            parse_options=pacsv.ParseOptions(newlines_in_values=True),
+            convert_options=pacsv.ConvertOptions(include_columns=SOURCE_COLUMNS),
+        )
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
 
     # ------------------------------------------------------------------
     def tokenise(self, text: str) -> List[str]:
         """Tokenise ``text`` in a similar fashion to the C# NLP helper."""
 
-        text = text.lower()
-        text = re.sub(r"http\S+", "", text)  # remove hyperlinks
-        text = re.sub(r"[^#0-9a-z\s]", " ", text)
-        tokens = TOKEN_RE.findall(text)
+        text = CLEAN_RE.sub(" ", text.lower())
+        return self._filter_tokens(TOKEN_RE.findall(text))
+
+    def tokenise_series(self, texts: pd.Series) -> List[List[str]]:
+        """Tokenise a whole column of texts at once.
+
+        Equivalent to calling :meth:`tokenise` on every element but the
+        cleaning and token extraction run through pandas' ``.str`` accessor
+        instead of a Python-level loop per row.
+        """
+
+        # Arrow-backed columns would run ``.str`` on Arrow's own lowercasing
+        # and RE2 kernel, whose ASCII-only ``\s`` changes the tokens, so the
+        # column is converted to Python strings first.  Token extraction calls
+        # ``TOKEN_RE`` directly so it uses ``re2`` whenever that is installed.
+        cleaned = texts.astype(object).str.lower().str.replace(CLEAN_RE, " ", regex=True)
+        return [
+            self._filter_tokens(TOKEN_RE.findall(text))
+            for text in cleaned.to_numpy(dtype=object).tolist()
+        ]
+
+    @staticmethod
+    def _filter_tokens(tokens: List[str]) -> List[str]:
+        """Drop retweet markers, mentions and stop words from ``tokens``."""
+
         if tokens and tokens[0] == "rt":
             tokens = tokens[1:]
 
@@ -225,6 +333,8 @@ class DataHelper:
             if tok == "rt" and first:
                 first = False
                 continue
-            cleaned.append(tok)
+            # Interning deduplicates words repeated across sources and makes
+            # the word-id lookups in the HKT algorithm cheaper.
+            cleaned.append(sys.intern(tok))
             first = False
         return cleaned
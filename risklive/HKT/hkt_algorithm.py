@@ -35,19 +35,49 @@ the tree are implemented; the classes mirror the structure of the C# types
 
 from __future__ import annotations
 
-from collections import Counter, OrderedDict
-from copy import deepcopy
+from collections import Counter
 from dataclasses import dataclass, field
-from typing import Dict,  List, Optional, Set, Tuple
+from itertools import islice
+import sys
+from typing import AbstractSet, Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
 
 from data_helper import Source
 
 
+# Inverted index of the SourceWord dataset: word id -> ids of the sources that
+# contain it.  Keys are kept in the order of the C# dictionaries, i.e. by
+# number of sources descending and then by word id, so the first key is always
+# the most frequent word.  A word's number of sources is ``len`` of its set.
+WordIndex = Dict[int, Set[int]]
+
+_EMPTY_IDS: AbstractSet[int] = frozenset()
+
+# The bitset path packs every expected word's sources in Python and pays a
+# fixed NumPy overhead per word, which only pays off once an 1 has several
+# nodes holding a few thousand sources between them; below either bound the
+# per-node set intersections are cheaper.
+BITSET_MIN_NODES = 6
+BITSET_MIN_NODE_SOURCES = 4096
+
+if hasattr(np, "bitwise_count"):  # NumPy >= 2.0
+    _popcount = np.bitwise_count
+else:  # pragma: no cover - older NumPy
+    _POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def _popcount(words: np.ndarray) -> np.ndarray:
+        return _POPCOUNT_TABLE[words.view(np.uint8)].reshape(*words.shape, 8).sum(axis=-1)
+
+
 # ---------------------------------------------------------------------------
 # Data classes
 
+# Slotted instances drop the per-object ``__dict__``; ``slots`` needs 3.10+.
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class SourceWord:
     """Represents a word appearing in a particular source."""
 
@@ -58,7 +88,7 @@ class SourceWord:
     word_no_of_sources: int
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class Node:
     """A node inside an :class:`1`."""
 
@@ -69,7 +99,7 @@ class Node:
     top_words: List[int] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class HKT:
     """A Hierarchical Knowledge Tree."""
 
@@ -79,6 +109,61 @@ class HKT:
     parent_node_id: int = 0
 
 
+class _NodeBitsets:
+    """Source membership of an 1's nodes packed into ``uint64`` rows.
+
+    Row ``i`` mirrors ``hkt.nodes[i].source_ids`` with one bit per source
+    position, so the overlap of a word with every node is a single
+    bitwise-AND and popcount over the whole matrix.  Positions are assigned
+    locally from the sources of the 1's own words, so rows are only as wide
+    as that level rather than the whole dataset.
+    """
+
+    def __init__(self, source_ids: AbstractSet[int]) -> None:
+        self.source_positions = {sid: pos for pos, sid in enumerate(source_ids)}
+        lanes = max(1, (len(self.source_positions) + 63) // 64)
+        self.rows = np.zeros((BITSET_MIN_NODES * 2, lanes), dtype=np.uint64)
+        self.sizes = np.zeros(BITSET_MIN_NODES * 2, dtype=np.int64)
+        self.count = 0
+
+    def pack(self, source_ids: AbstractSet[int]) -> np.ndarray:
+        row = np.zeros(self.rows.shape[1], dtype=np.uint64)
+        if source_ids:
+            positions = np.fromiter(
+                (self.source_positions[sid] for sid in source_ids),
+                dtype=np.uint64,
+                count=len(source_ids),
+            )
+            np.bitwise_or.at(
+                row,
+                (positions >> np.uint64(6)).astype(np.intp),
+                np.left_shift(np.uint64(1), positions & np.uint64(63)),
+            )
+        return row
+
+    def append(self, row: np.ndarray, size: int) -> None:
+        if self.count == len(self.rows):
+            self.rows = np.concatenate([self.rows, np.zeros_like(self.rows)])
+            self.sizes = np.concatenate([self.sizes, np.zeros_like(self.sizes)])
+        self.rows[self.count] = row
+        self.sizes[self.count] = size
+        self.count += 1
+
+    def merge(self, index: int, row: np.ndarray, size: int) -> None:
+        self.rows[index] |= row
+        self.sizes[index] = size
+
+    def best_match(self, row: np.ndarray, threshold: float) -> Optional[int]:
+        """Index of the first node with the highest overlap ratio >= ``threshold``."""
+
+        inter = _popcount(self.rows[: self.count] & row).sum(axis=1)
+        ratios = inter / self.sizes[: self.count]
+        collided = np.flatnonzero(ratios >= threshold)
+        if not len(collided):
+            return None
+        return int(collided[np.argmax(ratios[collided])])
+
+
 # ---------------------------------------------------------------------------
 # Algorithm implementation
 
@@ -106,6 +191,18 @@ class HKTAlgorithm:
         self.nodeDS: Dict[int, Node] = {}
         self.HKTDS: Dict[int, HKT] = {}
 
+        # Last node / 1 id handed out; ids are minted from these counters
+        # rather than from the size of the datasets.
+        self._next_node_id = 0
+        self._next_hkt_id = 0
+
+        # Forward index of the SourceWord dataset: source id -> word ids.
+        self._source_word_ids: Dict[int, List[int]] = {}
+
+        # Child HKTs keyed by the node they branch from, kept up to date as
+        # branches are created so callers do not have to rebuild it.
+        self.children_by_parent: Dict[int, List[HKT]] = {}
+
     # Public API -----------------------------------------------------------
 
     def build(self, sources: Dict[int, Source]) -> Tuple[Dict[int, HKT], Dict[str, int]]:
@@ -120,17 +217,23 @@ class HKTAlgorithm:
         self.nodeDS = {}
         self.HKTDS = {}
         self.wordDS = {}
+        self.children_by_parent = {}
+        self._next_node_id = 0
+        self._next_hkt_id = 0
+        self._source_word_ids = {}
 
         # ------------------------------------------------------------------
         # Step 1 – gather all words and their counts across sources
+        # The unique words of each source are kept for the SourceWord build
+        # below so they are only computed once.
         word_counts: Counter[str] = Counter()
-        all_words: Set[str] = set()
+        unique_words_per_source: List[Tuple[int, Set[str]]] = []
         for src in sources.values():
-            unique_words = set(src.words)
+            unique_words = set(src.words)  # only count once per source
             word_counts.update(unique_words)
-            all_words.update(unique_words)
+            unique_words_per_source.append((src.source_id, unique_words))
 
-        number_of_words = len(all_words)
+        number_of_words = len(word_counts)
 
         # Assign ids to words that pass the important-word threshold
         word_to_id: Dict[str, int] = {}
@@ -142,44 +245,31 @@ class HKTAlgorithm:
 
         self.wordDS = {wid: w for w, wid in word_to_id.items()}
 
-        # Build the SourceWord dataset (step 2 in the C# code)
-        source_words: List[SourceWord] = []
-        sw_id = 1
-        for src in sources.values():
-            for word in set(src.words):  # only count once per source
-                if word in word_to_id:
-                    source_words.append(
-                        SourceWord(
-                            source_word_id=sw_id,
-                            source_id=src.source_id,
-                            word_id=word_to_id[word],
-                            word=word,
-                            word_no_of_sources=word_counts[word],
-                        )
-                    )
-                    sw_id += 1
-
-        update_source_word_relation_db = len(source_words)
-
-        # Sort by number of sources descending to mirror the C# dictionaries
-        sorted_sw = sorted(
-            source_words,
-            key=lambda sw: (-sw.word_no_of_sources, sw.word_id),
-        )
-
-        main_word_ds: "OrderedDict[int, SourceWord]" = OrderedDict(
-            (i, sw) for i, sw in enumerate(sorted_sw, start=1)
-        )
-        source_word_ds: "OrderedDict[int, SourceWord]" = OrderedDict(
-            (k, deepcopy(v)) for k, v in main_word_ds.items()
+        # Build the SourceWord dataset (step 2 in the C# code) as parallel
+        # columns rather than one SourceWord object per relation
+        sw_source_ids: List[int] = []
+        sw_word_ids: List[int] = []
+        for source_id, unique_words in unique_words_per_source:
+            # one hash per word: ``get`` both tests and fetches the id
+            word_ids = [wid for wid in map(word_to_id.get, unique_words) if wid is not None]
+            self._source_word_ids.setdefault(source_id, []).extend(word_ids)
+            sw_word_ids.extend(word_ids)
+            sw_source_ids.extend([source_id] * len(word_ids))
+
+        update_source_word_relation_db = len(sw_word_ids)
+
+        main_word_index = self.index_source_words(
+            np.array(sw_word_ids, dtype=np.int64),
+            np.array(sw_source_ids, dtype=np.int64),
+            np.array([0, *(word_counts[word] for word in word_to_id)], dtype=np.int64),
         )
 
         # ------------------------------------------------------------------
         # Step 3 – create the first 1 and recursively build branches
-        hkt = self.create_hkt(source_word_ds, parent_node_id=0)
+        hkt = self.create_hkt(main_word_index, parent_node_id=0)
         if hkt:
             self.HKTDS[hkt.hkt_id] = hkt
-            self.create_branches(hkt, main_word_ds)
+            self.create_branches(hkt, main_word_index)
 
         stats = {
             "number_loaded": len(sources),
@@ -194,37 +284,32 @@ class HKTAlgorithm:
 
     # Core algorithm ------------------------------------------------------
 
-    def find_expected_words_general(
-        self, source_word_ds: "OrderedDict[int, SourceWord]"
-    ) -> List[int]:
-        if not source_word_ds:
+    def find_expected_words_general(self, word_index: WordIndex) -> List[int]:
+        if not word_index:
+            return []
+        counts = np.fromiter(
+            map(len, word_index.values()), dtype=np.int64, count=len(word_index)
+        )
+        maximum = counts[0]
+        if maximum == 0:
             return []
-        maximum = next(iter(source_word_ds.values())).word_no_of_sources
-        expected: List[int] = []
-        seen: Set[int] = set()
-        for sw in source_word_ds.values():
-            if maximum == 0:
-                break
-            ratio = sw.word_no_of_sources / maximum
-            if ratio >= self.minimum_threshold_against_max_word_count and sw.word_id not in seen:
-                expected.append(sw.word_id)
-                seen.add(sw.word_id)
-            elif ratio < self.minimum_threshold_against_max_word_count:
-                break
-        return expected
+        # Counts are non-increasing, so the expected words are the prefix that
+        # precedes the first word below the threshold.
+        below = counts / maximum < self.minimum_threshold_against_max_word_count
+        end = int(below.argmax()) if below.any() else len(counts)
+        return list(islice(word_index, end))
 
     def create_node(
         self,
         new_node_id: int,
         hkt_id: int,
-        source_word_ds: "OrderedDict[int, SourceWord]",
+        word_index: WordIndex,
         word_id: int,
     ) -> Node:
         node = Node(node_id=new_node_id, hkt_id=hkt_id)
         node.word_ids.add(word_id)
-        for sw in source_word_ds.values():
-            if sw.word_id == word_id:
-                node.source_ids.add(sw.source_id)
+        # Copied: node sources grow as colliding words are merged in.
+        node.source_ids = set(word_index.get(word_id, _EMPTY_IDS))
         return node
 
     def create_node_for_refuge_sources(
@@ -235,11 +320,8 @@ class HKTAlgorithm:
         node.source_ids.update(refuge_sources)
         return node
 
-    def remove_word_from_source_word_ds(
-        self, word_id: int, source_word_ds: "OrderedDict[int, SourceWord]"
-    ) -> None:
-        for key in [k for k, sw in source_word_ds.items() if sw.word_id == word_id]:
-            del source_word_ds[key]
+    def remove_word_from_source_word_ds(self, word_id: int, consumed: Set[int]) -> None:
+        consumed.add(word_id)
 
     def remove_word_from_expected_words(
         self, expected_words: List[int], word_id: int
@@ -251,68 +333,115 @@ class HKTAlgorithm:
 
     def create_hkt(
         self,
-        source_word_ds: "OrderedDict[int, SourceWord]",
+        word_index: WordIndex,
         parent_node_id: int,
+        consumed: Optional[Set[int]] = None,
     ) -> Optional[HKT]:
-        expected_words = self.find_expected_words_general(source_word_ds)
+        """Create an 1 from ``word_index``.
+
+        ``word_index`` is shared with the caller and left untouched.  Words
+        that end up in a node are added to ``consumed`` instead; any other
+        word was not expected at this level.
+        """
+
+        if consumed is None:
+            consumed = set()
+
+        expected_words = self.find_expected_words_general(word_index)
         if not expected_words:
             return None
 
-        hkt_id = len(self.HKTDS) + 1
+        self._next_hkt_id += 1
+        hkt_id = self._next_hkt_id
         hkt = HKT(hkt_id=hkt_id, expected_words=expected_words, parent_node_id=parent_node_id)
 
         # Create first node based on the most frequent word
-        first_word_id = next(iter(source_word_ds.values())).word_id
-        new_node_id = len(self.nodeDS) + 1
-        new_node = self.create_node(new_node_id, hkt_id, source_word_ds, first_word_id)
+        first_word_id = next(iter(word_index))
+        self._next_node_id += 1
+        new_node_id = self._next_node_id
+        new_node = self.create_node(new_node_id, hkt_id, word_index, first_word_id)
         hkt.nodes.append(new_node)
         self.nodeDS[new_node_id] = new_node
 
-        self.remove_word_from_source_word_ds(first_word_id, source_word_ds)
+        self.remove_word_from_source_word_ds(first_word_id, consumed)
         self.remove_word_from_expected_words(expected_words, first_word_id)
 
         # Process remaining expected words ---------------------------------
+        bitsets: Optional[_NodeBitsets] = None
+        node_sources_total = len(new_node.source_ids)
         for expected_word in list(expected_words):
-            sources_of_expected = {
-                sw.source_id for sw in source_word_ds.values() if sw.word_id == expected_word
-            }
-
-            collided_nodes: Dict[int, float] = {}
-            for previous_node in hkt.nodes:
-                node_sources = previous_node.source_ids
-                if not node_sources:
-                    continue
-                inter = len(node_sources & sources_of_expected)
-                union = len(node_sources)
-                if union and (inter / union) >= self.similarity_threshold:
-                    collided_nodes[previous_node.node_id] = inter / union
-
-            if collided_nodes:
-                best_node_id = max(collided_nodes.items(), key=lambda x: x[1])[0]
-                best_node = next(n for n in hkt.nodes if n.node_id == best_node_id)
+            sources_of_expected = word_index.get(expected_word, _EMPTY_IDS)
+
+            if (
+                bitsets is None
+                and len(hkt.nodes) >= BITSET_MIN_NODES
+                and node_sources_total >= BITSET_MIN_NODE_SOURCES
+            ):
+                # Every node's sources come from the 1's own words.
+                bitsets = _NodeBitsets(
+                    set(word_index.get(first_word_id, _EMPTY_IDS)).union(
+                        *(word_index.get(word_id, _EMPTY_IDS) for word_id in expected_words)
+                    )
+                )
+                for previous_node in hkt.nodes:
+                    bitsets.append(
+                        bitsets.pack(previous_node.source_ids), len(previous_node.source_ids)
+                    )
+
+            best_node: Optional[Node] = None
+            if bitsets is not None:
+                word_row = bitsets.pack(sources_of_expected)
+                best_index = bitsets.best_match(word_row, self.similarity_threshold)
+                if best_index is not None:
+                    best_node = hkt.nodes[best_index]
+            else:
+                # Running argmax; the strict ``>`` keeps the first node on ties.
+                best_ratio = 0.0
+                for previous_node in hkt.nodes:
+                    node_sources = previous_node.source_ids
+                    if not node_sources:
+                        continue
+                    ratio = len(node_sources & sources_of_expected) / len(node_sources)
+                    if ratio >= self.similarity_threshold and (
+                        best_node is None or ratio > best_ratio
+                    ):
+                        best_node = previous_node
+                        best_ratio = ratio
+
+            if best_node is not None:
+                # ``hkt.nodes`` and ``nodeDS`` hold the same Node objects.
                 best_node.word_ids.add(expected_word)
+                node_sources_total -= len(best_node.source_ids)
                 best_node.source_ids.update(sources_of_expected)
-                self.nodeDS[best_node.node_id].word_ids.add(expected_word)
-                self.nodeDS[best_node.node_id].source_ids.update(sources_of_expected)
-                self.remove_word_from_source_word_ds(expected_word, source_word_ds)
+                node_sources_total += len(best_node.source_ids)
+                if bitsets is not None:
+                    bitsets.merge(best_index, word_row, len(best_node.source_ids))
+                self.remove_word_from_source_word_ds(expected_word, consumed)
             else:
-                other_node_id = len(self.nodeDS) + 1
+                self._next_node_id += 1
+                other_node_id = self._next_node_id
                 other_node = self.create_node(
-                    other_node_id, hkt_id, source_word_ds, expected_word
+                    other_node_id, hkt_id, word_index, expected_word
                 )
                 hkt.nodes.append(other_node)
                 self.nodeDS[other_node_id] = other_node
-                self.remove_word_from_source_word_ds(expected_word, source_word_ds)
+                node_sources_total += len(other_node.source_ids)
+                if bitsets is not None:
+                    bitsets.append(word_row, len(other_node.source_ids))
+                self.remove_word_from_source_word_ds(expected_word, consumed)
 
         # Refugee sources ---------------------------------------------------
-        refugee_sources = {sw.source_id for sw in source_word_ds.values()}
+        refugee_sources: Set[int] = set().union(
+            *(source_ids for word_id, source_ids in word_index.items() if word_id not in consumed)
+        )
         node_sources: Set[int] = set()
         for node in hkt.nodes:
             node_sources.update(node.source_ids)
         refugee_sources.difference_update(node_sources)
 
         if refugee_sources:
-            ref_node_id = len(self.nodeDS) + 1
+            self._next_node_id += 1
+            ref_node_id = self._next_node_id
             ref_node = self.create_node_for_refuge_sources(
                 ref_node_id, hkt_id, refugee_sources
             )
@@ -323,64 +452,123 @@ class HKTAlgorithm:
 
     # Branch creation -----------------------------------------------------
 
-    def create_branches(
-        self, hkt: HKT, source_word_ds: "OrderedDict[int, SourceWord]"
-    ) -> None:
-        for node in hkt.nodes:
-            if len(node.source_ids) > self.minimum_sources_branch:
-                temp_source_word_ds: "OrderedDict[int, SourceWord]" = OrderedDict()
-
-                if -1 not in node.word_ids:  # not a refuge node
-                    for key, sw in source_word_ds.items():
-                        if sw.word_id not in node.word_ids and sw.source_id in node.source_ids:
-                            temp_source_word_ds[key] = deepcopy(sw)
-                else:
-                    for key, sw in source_word_ds.items():
-                        if sw.source_id in node.source_ids:
-                            temp_source_word_ds[key] = deepcopy(sw)
-
-                self.update_word_no_of_sources(temp_source_word_ds)
-
-                main_word_ds = OrderedDict(
-                    sorted(
-                        temp_source_word_ds.items(),
-                        key=lambda item: (-item[1].word_no_of_sources, item[1].word_id),
-                    )
-                )
+    def create_branches(self, hkt: HKT, word_index: WordIndex) -> None:
+        """Create the child 1s below ``hkt`` and, depth first, below those.
 
-                if main_word_ds:
-                    self.add_node_top_words(node, main_word_ds)
-                    new_source_word_ds = OrderedDict(
-                        (k, deepcopy(v)) for k, v in main_word_ds.items()
-                    )
-                    hkt_child = self.create_hkt(new_source_word_ds, node.node_id)
-                    if hkt_child:
-                        self.HKTDS[hkt_child.hkt_id] = hkt_child
-                        if new_source_word_ds:
-                            self.create_branches(hkt_child, main_word_ds)
+        The descent uses an explicit stack of node iterators instead of
+        recursion, so deep trees are not limited by Python's recursion limit.
+        A child is fully expanded before its parent's next node is visited,
+        which keeps the node and 1 ids in the original order.
+        """
+
+        stack: List[Tuple[Iterator[Node], WordIndex]] = [(iter(hkt.nodes), word_index)]
+        while stack:
+            nodes, parent_index = stack[-1]
+            node = next(nodes, None)
+            if node is None:
+                stack.pop()
+                continue
+            branch = self._create_branch(node, parent_index)
+            if branch is not None:
+                hkt_child, main_word_index = branch
+                stack.append((iter(hkt_child.nodes), main_word_index))
+
+    def _create_branch(
+        self, node: Node, word_index: WordIndex
+    ) -> Optional[Tuple[HKT, WordIndex]]:
+        """Create the child 1 of ``node``.
+
+        Returns the child and its word index when the child has words left
+        over to branch on, otherwise ``None``.
+        """
+
+        if len(node.source_ids) <= self.minimum_sources_branch:
+            return None
+
+        # Walk the node's own sources through the forward index, so the work
+        # is bounded by the relations inside the node rather than by every
+        # word of the parent index.
+        temp_word_index: WordIndex = {}
+        excluded_words = node.word_ids if -1 not in node.word_ids else _EMPTY_IDS
+        for source_id in node.source_ids:
+            for word_id in self._source_word_ids.get(source_id, ()):
+                if word_id in word_index and word_id not in excluded_words:
+                    temp_word_index.setdefault(word_id, set()).add(source_id)
+
+        main_word_index = self.sort_word_index(temp_word_index)
+        if not main_word_index:
+            return None
+
+        self.add_node_top_words(node, main_word_index)
+        consumed: Set[int] = set()
+        hkt_child = self.create_hkt(main_word_index, node.node_id, consumed)
+        if not hkt_child:
+            return None
+
+        self.HKTDS[hkt_child.hkt_id] = hkt_child
+        self.children_by_parent.setdefault(node.node_id, []).append(hkt_child)
+        if len(consumed) < len(main_word_index):
+            return hkt_child, main_word_index
+        return None
 
     # Helper methods ------------------------------------------------------
 
-    def add_node_top_words(
-        self, node: Node, main_word_ds: "OrderedDict[int, SourceWord]"
-    ) -> None:
+    def add_node_top_words(self, node: Node, main_word_index: WordIndex) -> None:
         if -1 not in node.word_ids:
             for wid in node.word_ids:
                 node.top_words.append(wid)
-            for sw in main_word_ds.values():
-                if sw.word_id not in node.top_words:
-                    node.top_words.append(sw.word_id)
+            for word_id in main_word_index:
+                if word_id not in node.top_words:
+                    node.top_words.append(word_id)
                 if len(node.top_words) >= 10:
                     break
 
-    def update_word_no_of_sources(
-        self, temp_source_word_ds: "OrderedDict[int, SourceWord]"
-    ) -> None:
-        counts = Counter()
-        for sw in temp_source_word_ds.values():
-            counts[sw.word_id] += 1
-        for sw in temp_source_word_ds.values():
-            sw.word_no_of_sources = counts[sw.word_id]
+    @staticmethod
+    def index_source_words(
+        sw_word_id: np.ndarray, sw_source_id: np.ndarray, word_no_of_sources: np.ndarray
+    ) -> WordIndex:
+        """Group the SourceWord columns into a :data:`WordIndex`.
+
+        ``word_no_of_sources`` is indexed by word id.  The relations are
+        ordered like the C# dictionaries with one ``lexsort`` and then split
+        at every change of word.
+        """
+
+        if not len(sw_word_id):
+            return {}
+        order = np.lexsort((sw_word_id, -word_no_of_sources[sw_word_id]))
+        sw_word_id = sw_word_id[order]
+        sw_source_id = sw_source_id[order]
+        starts = np.flatnonzero(np.diff(sw_word_id)) + 1
+        return {
+            word_id: set(source_ids.tolist())
+            for word_id, source_ids in zip(
+                sw_word_id[np.r_[0, starts]].tolist(), np.split(sw_source_id, starts)
+            )
+        }
+
+    @staticmethod
+    def sort_word_index(word_index: WordIndex) -> WordIndex:
+        """Return ``word_index`` ordered by number of sources, then word id.
+
+        Branch indexes are filtered from an already ordered parent and often
+        keep its order, in which case ``word_index`` is returned unchanged.
+        """
+
+        if len(word_index) < 2:
+            return word_index
+        word_ids = np.fromiter(word_index, dtype=np.int64, count=len(word_index))
+        counts = np.fromiter(
+            map(len, word_index.values()), dtype=np.int64, count=len(word_index)
+        )
+        in_order = (counts[:-1] > counts[1:]) | (
+            (counts[:-1] == counts[1:]) & (word_ids[:-1] < word_ids[1:])
+        )
+        if in_order.all():
+            return word_index
+        keys = list(word_index)
+        source_sets = list(word_index.values())
+        return {keys[i]: source_sets[i] for i in np.lexsort((word_ids, -counts)).tolist()}
 
 
 __all__ = [
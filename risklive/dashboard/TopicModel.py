@@ -17,27 +17,34 @@ margins_css = """
 st.markdown(margins_css, unsafe_allow_html=True)
 IMG_DIR = "./results/images"
 report_path = "./results/data/df_report.csv"
+# Figures in the order main() indexes them; their mtimes key the figure cache.
+FIGURE_FILES = ['3d_time_plot.pkl', 'topics.json', 'barchart.json', 'topics_over_time.json',
+                'documents.json', 'hierarchy.json', 'treemap.pkl']
+TREE_FILE = 'topic_tree.txt'
 
-def get_figures():
-    with open(os.path.join(IMG_DIR, '3d_time_plot.pkl'), 'rb') as f:
-        fig1 = pickle.load(f)
-    
-    with open(os.path.join(IMG_DIR, 'treemap.pkl'), 'rb') as f:
-        fig2 = pickle.load(f)
-    
-    json_files = ['topics.json', 'barchart.json', 'topics_over_time.json', 'documents.json', 'hierarchy.json']
-    json_figures = [fig1]
-    for file in json_files:
-        with open(os.path.join(IMG_DIR, file), 'r') as f:
-            fig = pio.from_json(f.read())
-            json_figures.append(fig)
-    json_figures.append(fig2)
-    tree_path = os.path.join(IMG_DIR, 'topic_tree.txt')
-    with open(tree_path, 'r') as f:
+# Passed to the cached loaders so they reload when a file is rewritten.
+def get_mtimes(paths):
+    return tuple(os.stat(path).st_mtime_ns for path in paths)
+
+# The figures are only read for display, so they are cached as shared objects
+# rather than being copied out of the cache on every rerun.
+@st.cache_resource(show_spinner=False, max_entries=1)
+def get_figures(mtimes):
+    json_figures = []
+    for file in FIGURE_FILES:
+        path = os.path.join(IMG_DIR, file)
+        if file.endswith('.pkl'):
+            with open(path, 'rb') as f:
+                json_figures.append(pickle.load(f))
+        else:
+            with open(path, 'r') as f:
+                json_figures.append(pio.from_json(f.read()))
+    with open(os.path.join(IMG_DIR, TREE_FILE), 'r') as f:
         tree = f.read()
     return json_figures, tree
 
-def get_report():
+@st.cache_data(show_spinner=False, max_entries=1)
+def get_report(mtime):
     df = pd.read_csv(report_path)
     df = df[['keyword', 'response']]
     return df
@@ -46,9 +53,9 @@ def main():
     st.title("Risk Live: Topic Modeling")
     st.write("This app applies topic modeling on news articles from the past 72hours and visualizes them. There is a seperate tab for summary and alerts")
 
-    json_figures, tree = get_figures()
+    json_figures, tree = get_figures(get_mtimes(os.path.join(IMG_DIR, file) for file in [*FIGURE_FILES, TREE_FILE]))
     with st.expander("Daily Report"):
-        df = get_report()
+        df = get_report(os.stat(report_path).st_mtime_ns)
         keyword = st.selectbox("Select Topic", df['keyword'].unique(), key="topic_selector")
         response = df[df['keyword'] == keyword]['response'].values[0]
         st.write(response)
@@ -116,13 +116,15 @@ def aggregate_regular_news(hours=1, save_folder = None):
         full_news_df = pd.DataFrame()
         
     since_date = int((datetime.now() - pd.DateOffset(hours=hours)).timestamp())
+    # Concatenated and de-duplicated once at the end; keeping the first
+    # occurrence gives the same rows as de-duplicating after every step.
+    frames = [full_news_df]
     for category in CATEGORIES:
-        news_by_category_df = extract_news_by_category(category=category, since = since_date)
-        full_news_df = pd.concat([full_news_df, news_by_category_df]).drop_duplicates(subset=['URL'], keep='first')
+        frames.append(extract_news_by_category(category=category, since = since_date))
     
     for query in QUERIES:
-        search_news_df = search_news(query=query, since=since_date)
-        full_news_df = pd.concat([full_news_df, search_news_df]).drop_duplicates(subset=['URL'], keep='first')
+        frames.append(search_news(query=query, since=since_date))
+    full_news_df = pd.concat(frames, ignore_index=True).drop_duplicates(subset=['URL'], keep='first')
 
     full_news_df.dropna(subset=['Description'], inplace=True)
     if save_folder:
@@ -132,23 +134,20 @@ def aggregate_regular_news(hours=1, save_folder = None):
     return full_news_df
 
 def aggregate_news_data(is_trending=True, days=3, save_folder = None):
-    full_news_df = pd.DataFrame()
+    frames = []
     since_date = int((datetime.now() - pd.DateOffset(days=days)).timestamp())
     
     if is_trending:
-        trending_topics_df = search_news_for_trending_topics(since_date)
-        full_news_df = pd.concat([full_news_df, trending_topics_df])
+        frames.append(search_news_for_trending_topics(since_date))
         
     for category in CATEGORIES:
-        news_by_category_df = extract_news_by_category(category=category, since = since_date)
-        full_news_df = pd.concat([full_news_df, news_by_category_df])
+        frames.append(extract_news_by_category(category=category, since = since_date))
         
     
     for query in QUERIES:
-        search_news_df = search_news(query=query, since=since_date)
-        full_news_df = pd.concat([full_news_df, search_news_df])
+        frames.append(search_news(query=query, since=since_date))
 
-    full_news_df = full_news_df.drop_duplicates(subset=['URL'])
+    full_news_df = pd.concat(frames, ignore_index=True).drop_duplicates(subset=['URL'])
     if save_folder:
         os.makedirs(save_folder, exist_ok=True)
         full_news_df.dropna(subset=['Description'], inplace=True)
@@ -1,18 +1,28 @@
 import os
 import requests
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
 from risklive.config import SERPAPI_API_KEY, CATEGORIES, QUERIES
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Searches are independent and dominated by network wait, so they are issued
+# concurrently over one pooled session that reuses connections (and their TLS
+# handshakes) across calls.
+MAX_WORKERS = 8
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+
 class SerpNewsAPI:
     def __init__(self, api_key):
         self.api_key = api_key
         self.base_url = "https://serpapi.com/search"
+        self._session = _session
 
-    def search_news(self, query, date_from=None, is_trending=False):
+    def search_news(self, query, date_from=None, is_trending=False, date_to=None):
         params = {
             "engine": "google_news",
             "q": query,
@@ -22,61 +32,69 @@ class SerpNewsAPI:
             "num": 100,
         }
         if date_from:
-            params["tbs"] = f"cdr:1,cd_min:{date_from},cd_max:{datetime.now().strftime('%Y-%m-%d')}"
+            date_to = date_to or datetime.now().strftime('%Y-%m-%d')
+            params["tbs"] = f"cdr:1,cd_min:{date_from},cd_max:{date_to}"
 
-        response = requests.get(self.base_url, params=params)
+        response = self._session.get(self.base_url, params=params)
         response.raise_for_status()
         return response.json()
 
-def search_news(query, since):
+def search_news(query, since, date_to=None):
     serp_api = SerpNewsAPI(api_key=SERPAPI_API_KEY)
     date_str = datetime.fromtimestamp(since).strftime('%Y-%m-%d')
-    data = serp_api.search_news(query=query, date_from=date_str)
+    data = serp_api.search_news(query=query, date_from=date_str, date_to=date_to)
     articles = data.get("news_results", [])
     rows = [(a.get("title"), a.get("link"), a.get("snippet"), a.get("date"), "no") for a in articles]
     return pd.DataFrame(rows, columns=['Title', 'URL', 'Description', 'Timestamp', 'IsTrending'])
 
-def extract_trending_topics(since):
+def extract_trending_topics(since, date_to=None):
     # Placeholder: no trending endpoint in SerpAPI, use top news instead
     serp_api = SerpNewsAPI(api_key=SERPAPI_API_KEY)
     date_str = datetime.fromtimestamp(since).strftime('%Y-%m-%d')
-    data = serp_api.search_news(query="top news", date_from=date_str)
+    data = serp_api.search_news(query="top news", date_from=date_str, date_to=date_to)
     articles = data.get("news_results", [])
     topics = [(a.get("title"), a.get("link"), a.get("link"), True) for a in articles]
     return pd.DataFrame(topics, columns=['Name', 'WebSearchURL', 'NewsSearchURL', 'IsBreakingNews'])
 
-def extract_news_by_category(category, since):
-    return search_news(query=category, since=since)
+def extract_news_by_category(category, since, date_to=None):
+    return search_news(query=category, since=since, date_to=date_to)
 
-def search_news_for_trending_topics(since):
-    trending_df = extract_trending_topics(since)
+def search_news_for_trending_topics(since, date_to=None):
+    trending_df = extract_trending_topics(since, date_to=date_to)
     serp_api = SerpNewsAPI(api_key=SERPAPI_API_KEY)
     all_articles = []
-    for _, row in trending_df.iterrows():
-        topic = row['Name']
-        data = serp_api.search_news(query=topic, is_trending=True)
-        articles = data.get("news_results", [])
-        all_articles.extend([
-            (a.get("title"), a.get("link"), a.get("snippet"), a.get("date"), "yes") for a in articles
-        ])
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        results = executor.map(
+            lambda topic: serp_api.search_news(query=topic, is_trending=True), trending_df['Name'].tolist()
+        )
+        for data in results:
+            articles = data.get("news_results", [])
+            all_articles.extend([
+                (a.get("title"), a.get("link"), a.get("snippet"), a.get("date"), "yes") for a in articles
+            ])
     return pd.DataFrame(all_articles, columns=['Title', 'URL', 'Description', 'Timestamp', 'IsTrending'])
 
 def aggregate_news_data(is_trending=True, days=3, save_folder=None):
-    full_df = pd.DataFrame()
-    since_ts = int((datetime.now() - timedelta(days=days)).timestamp())
+    # Collected and concatenated once: concatenating inside the loop copies the
+    # whole growing frame on every step.
+    frames = []
+    now = datetime.now()
+    since_ts = int((now - timedelta(days=days)).timestamp())
+    # Every search in one run shares the same window end.
+    date_to = now.strftime('%Y-%m-%d')
 
     if is_trending:
-        trending_df = search_news_for_trending_topics(since_ts)
-        full_df = pd.concat([full_df, trending_df])
-
-    for category in CATEGORIES:
-        cat_df = extract_news_by_category(category, since_ts)
-        full_df = pd.concat([full_df, cat_df])
+        frames.append(search_news_for_trending_topics(since_ts, date_to=date_to))
 
-    for query in QUERIES:
-        query_df = search_news(query=query, since=since_ts)
-        full_df = pd.concat([full_df, query_df])
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        cat_dfs = executor.map(
+            lambda category: extract_news_by_category(category, since_ts, date_to=date_to), CATEGORIES
+        )
+        query_dfs = executor.map(lambda query: search_news(query=query, since=since_ts, date_to=date_to), QUERIES)
+        frames.extend(cat_dfs)
+        frames.extend(query_dfs)
 
+    full_df = pd.concat(frames, ignore_index=True)
     full_df.drop_duplicates(subset=["URL"], inplace=True)
     full_df.dropna(subset=["Description"], inplace=True)
     if save_folder:
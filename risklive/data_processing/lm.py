@@ -2,9 +2,13 @@ import os
 import openai
 import logging
 import json
+from functools import lru_cache
 from ..config import OPENAI_API_BASE, OPENAI_API_KEY, OPENAI_API_VERSION
 from tenacity import retry, stop_after_attempt, wait_fixed, retry_if_exception_type
 
+# One client per process so every call reuses its HTTP connection pool
+# (keep-alive connections and TLS sessions) instead of reconnecting.
+@lru_cache(maxsize=1)
 def initialize_client():
     try:
         client = openai.AzureOpenAI(
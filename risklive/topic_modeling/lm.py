@@ -1,13 +1,17 @@
 import os
+import io
 import openai
+import asyncio
 import logging
 import json
+from openai.types import CompletionUsage
 from ..config import OPENAI_API_BASE, OPENAI_API_KEY, OPENAI_API_VERSION
-from tenacity import retry, stop_after_attempt, wait_fixed, retry_if_exception_type
+from tenacity import retry, stop_after_attempt, wait_random_exponential, retry_if_exception_type, before_sleep_log
 
 def initialize_client():
     try:
-        client = openai.AzureOpenAI(
+        # Async client so the per-topic report prompts can be in flight together.
+        client = openai.AsyncAzureOpenAI(
             api_key=OPENAI_API_KEY,
             api_version=OPENAI_API_VERSION,
             azure_endpoint=OPENAI_API_BASE
@@ -18,13 +22,18 @@ def initialize_client():
         logging.error(f"Failed to initialize client: {e}")
         raise
 
-def pricing(token_usage, model):
+# Batch API requests are billed at half the interactive rate.
+BATCH_PRICE_FACTOR = 0.5
+
+def pricing(token_usage, model, batch=False):
     if model=="openai_chat":
         price = (token_usage.prompt_tokens * 0.003 + token_usage.completion_tokens * 0.0004) / 1000
     elif model=="gpt4":
         price = (token_usage.prompt_tokens * 0.048 + token_usage.completion_tokens * 0.096) / 1000
     elif model=="gpt4o":
         price = (token_usage.prompt_tokens * 0.004 + token_usage.completion_tokens * 0.0119) / 1000
+    if batch:
+        price *= BATCH_PRICE_FACTOR
     return price
 
 def load_prompt_template(file_path):
@@ -35,39 +44,88 @@ def load_prompt_template(file_path):
 def format_prompt(prompt_template, **kwargs):
     return prompt_template.format(**kwargs)
 
-def is_rate_limit_error(exception):
-    return isinstance(exception, Exception) and '429' in str(exception)
-
+# Only transient failures are retried, with jittered exponential backoff so
+# concurrent requests do not retry in lockstep against the rate limiter.  Any
+# other error, or the last transient one, is raised to the caller.
 @retry(
-    retry=retry_if_exception_type(Exception),
-    stop=stop_after_attempt(2),
-    wait=wait_fixed(60),
-    retry_error_callback=lambda retry_state: (None, None, None)
+    retry=retry_if_exception_type((openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError)),
+    stop=stop_after_attempt(6),
+    wait=wait_random_exponential(min=1, max=60),
+    before_sleep=before_sleep_log(logging.getLogger(__name__), logging.WARNING),
+    reraise=True,
 )
-def api_call(client, model, user_prompt, system_prompt="You are a useful assistant.", temperature=0, max_tokens=1000):
-    try:
-        response = client.chat.completions.create(
-            model=model,
-            temperature=float(temperature),
-            max_tokens=int(max_tokens),
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ]
+async def api_call(client, model, user_prompt, system_prompt="You are a useful assistant.", temperature=0, max_tokens=1000):
+    response = await client.chat.completions.create(
+        model=model,
+        temperature=float(temperature),
+        max_tokens=int(max_tokens),
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+    )
+    response_output = response.choices[0].message.content
+    token_usage = response.usage
+    price = pricing(token_usage, model)
+    
+    logging.info("API call successful")
+    logging.info(f"Price: {price} USD")
+    logging.info(f"Response: {response_output}")
+    
+    return response_output, price, token_usage
+
+BATCH_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+# Runs ``user_prompts`` as one Batch API job, billed at the batch rate.  Returns
+# one (response, price, token_usage) per prompt, in order, with
+# (None, None, None) for prompts that did not complete.
+async def batch_api_call(client, model, user_prompts, system_prompt="You are a useful assistant.", temperature=0, max_tokens=1000, poll_interval=60):
+    if not user_prompts:
+        return []
+    lines = [
+        json.dumps({
+            "custom_id": str(i),
+            "method": "POST",
+            "url": "/chat/completions",
+            "body": {
+                "model": model,
+                "temperature": float(temperature),
+                "max_tokens": int(max_tokens),
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt},
+                ],
+            },
+        })
+        for i, user_prompt in enumerate(user_prompts)
+    ]
+    batch_input = await client.files.create(
+        file=("batch_input.jsonl", io.BytesIO("\n".join(lines).encode())), purpose="batch"
+    )
+    batch = await client.batches.create(
+        input_file_id=batch_input.id, endpoint="/chat/completions", completion_window="24h"
+    )
+    logging.info(f"Submitted batch {batch.id} with {len(lines)} requests")
+    while batch.status not in BATCH_TERMINAL_STATUSES:
+        await asyncio.sleep(poll_interval)
+        batch = await client.batches.retrieve(batch.id)
+
+    results = [(None, None, None)] * len(lines)
+    if batch.status != "completed" or not batch.output_file_id:
+        logging.error(f"Batch {batch.id} ended with status {batch.status}")
+        return results
+
+    output = await client.files.content(batch.output_file_id)
+    for line in output.text.splitlines():
+        item = json.loads(line)
+        response = item.get("response") or {}
+        if response.get("status_code") != 200:
+            logging.error(f"Batch request {item['custom_id']} failed: {item.get('error')}")
+            continue
+        body = response["body"]
+        token_usage = CompletionUsage(**body["usage"])
+        results[int(item["custom_id"])] = (
+            body["choices"][0]["message"]["content"], pricing(token_usage, model, batch=True), token_usage
         )
-        response_output = response.choices[0].message.content
-        token_usage = response.usage
-        price = pricing(token_usage, model)
-        
-        logging.info("API call successful")
-        logging.info(f"Price: {price} USD")
-        logging.info(f"Response: {response_output}")
-        
-        return response_output, price, token_usage
-    except Exception as e:
-        if is_rate_limit_error(e):
-            logging.warning(f"Rate limit exceeded. Retrying in 60 seconds: {e}")
-            raise
-        else:
-            logging.error(f"API call failed: {e}")
-            return None, None, None
+    logging.info(f"Batch {batch.id} completed")
+    return results
@@ -1,52 +1,193 @@
+import asyncio
+import contextlib
+import csv
+import functools
+import hashlib
 import logging
+import os
+import shelve
+import time
 import pandas as pd
 from collections import Counter
-from ..config import SAVE_DIR, PROMPTS
-from .lm import initialize_client, api_call, load_prompt_template, format_prompt
+from ..config import SAVE_DIR, PROMPTS, CLEANUP_DAYS_TO_KEEP
+from .lm import initialize_client, api_call, batch_api_call, load_prompt_template, format_prompt
 
-def extract_information(client, user_prompt, prompt_type='EXTRACTION_PROMPT'):
-    try:
-        model = "gpt4o"
-        response, price, token_usage = api_call(client, model, user_prompt=user_prompt)
-        return response, price, token_usage
-    except Exception as e:
-        logging.error(f"Failed to extract information: {e}")
-        return None, None, None  
+# Upper bound on report prompts in flight at once, to stay inside the
+# deployment's rate limit.
+MAX_CONCURRENT_REQUESTS = 20
+
+REPORT_SOURCE_COLUMNS = ["AlertFlag", "topic", "ShortSummary", "RelevantKeywords"]
+REPORT_COLUMNS = ["topic", "keyword", "input_prompt", "response", "price", "token_usage"]
+
+@contextlib.contextmanager
+def open_prompt_cache():
+    # Opened once per report run.  Entries older than CLEANUP_DAYS_TO_KEEP, the
+    # window of news a report covers, can no longer recur and are dropped.
+    cache_dir = SAVE_DIR["CACHE_DIR"]
+    os.makedirs(cache_dir, exist_ok=True)
+    with shelve.open(os.path.join(cache_dir, "llm_cache")) as cache:
+        cutoff = time.time() - CLEANUP_DAYS_TO_KEEP * 24 * 60 * 60
+        for key in [key for key, (saved_at, _) in cache.items() if saved_at < cutoff]:
+            del cache[key]
+        yield cache
+
+def prompt_cache_key(system_prompt, user_prompt):
+    return hashlib.blake2b(f"{system_prompt}\0{user_prompt}".encode(), digest_size=16).hexdigest()
+
+def cache_by_prompt(func):
+    # Reuses the stored (response, price, token_usage) of identical prompts
+    # from the run's open ``cache``, so re-running on unchanged data skips the
+    # API call.  Failed calls are not stored and are retried on the next run.
+    @functools.wraps(func)
+    async def wrapper(client, user_prompt, *args, cache, **kwargs):
+        key = prompt_cache_key(kwargs.get("system_prompt", ""), user_prompt)
+        if key in cache:
+            return cache[key][1]
+        result = await func(client, user_prompt, *args, **kwargs)
+        if result[0] is not None:
+            cache[key] = (time.time(), result)
+        return result
+    return wrapper
+
+@cache_by_prompt
+async def extract_information(client, user_prompt, prompt_type='EXTRACTION_PROMPT', *, system_prompt):
+    model = "gpt4o"
+    response, price, token_usage = await api_call(client, model, user_prompt=user_prompt, system_prompt=system_prompt)
+    return response, price, token_usage
+
+async def extract_information_bounded(client, semaphore, user_prompt, prompt_type='EXTRACTION_PROMPT', *, system_prompt, cache):
+    async with semaphore:
+        return await extract_information(client, user_prompt, prompt_type=prompt_type, system_prompt=system_prompt, cache=cache)
     
 def get_df():
     data_dir = SAVE_DIR["CSV_DATA_DIR"]
     file_path = f"{data_dir}/df_with_response_and_topics.csv"
-    df = pd.read_csv(file_path)
-    df = df[df["AlertFlag"] == "Red"]
+    # Only the columns the report uses are parsed.  With PyArrow installed the
+    # Red filter runs inside Arrow, so only the surviving rows are converted
+    # to pandas.
+    try:
+        import pyarrow.compute as pc
+        import pyarrow.csv as pacsv
+    except ImportError:
+        df = pd.read_csv(file_path, usecols=REPORT_SOURCE_COLUMNS, dtype={"AlertFlag": "category"})
+        df = df[df["AlertFlag"] == "Red"]
+    else:
+        # Summaries and LLM responses can hold quoted newlines, which Arrow only
+        # handles across its read blocks when told to expect them.
+        table = pacsv.read_csv(
+            file_path,
+            parse_options=pacsv.ParseOptions(newlines_in_values=True),
+            convert_options=pacsv.ConvertOptions(include_columns=REPORT_SOURCE_COLUMNS),
+        )
+        table = table.filter(pc.equal(table["AlertFlag"], "Red"))
+        df = table.select(["topic", "ShortSummary", "RelevantKeywords"]).to_pandas(types_mapper=pd.ArrowDtype)
+    # Categorised after filtering so only the topics of Red articles become
+    # categories; grouping then works on small integer codes.
+    df = df.astype({"topic": "category"})
     return df
 
-def get_keywords_by_frequency(keywords_list):
-    counts = Counter(keywords_list)
-    sorted_counts = sorted(counts.items(), key=lambda x: x[1], reverse=True)
-    return ", ".join([keyword for keyword, _ in sorted_counts[:5]])
+def get_keywords_by_frequency(keywords):
+    # Comma-separated five most frequent entries of ``keywords``.
+    return ", ".join(keyword for keyword, _ in Counter(keywords).most_common(5))
+
+def prepare_topic(group):
+    # Each row is split as the Counter consumes it, so only one row's split
+    # keywords and the distinct keywords are held at once.
+    keywords = (item.strip() for row_keywords in group["RelevantKeywords"].to_numpy() for item in row_keywords.split(","))
+    top_keywords = get_keywords_by_frequency(keywords)
+    # The report instructions go in the system message, identical for every
+    # topic, so only the news differs between requests and the shared
+    # prefix can be served from the provider's prompt cache.
+    input_news = "\n".join(group["ShortSummary"].to_numpy()) + "\n"
+    return top_keywords, input_news
+
+async def prepare_and_extract(client, semaphore, cache, topic, group, system_prompt):
+    # The topic is prepared off the event loop.  A failed request is recorded
+    # against its own topic and does not stop the others.
+    top_keywords, input_news = await asyncio.to_thread(prepare_topic, group)
+    try:
+        result = await extract_information_bounded(client, semaphore, input_news, prompt_type='REPORT_PROMPT', system_prompt=system_prompt, cache=cache)
+    except Exception as e:
+        logging.error(f"Failed to extract information for topic {topic}: {e}")
+        result = (None, None, None)
+    return top_keywords, input_news, result
+
+@contextlib.contextmanager
+def report_writer(out_path):
+    # Rows are streamed into a ``.partial`` sibling and only moved onto
+    # ``out_path`` once the run completes, so the dashboard never reads a
+    # truncated report while a crashed run still leaves its finished rows.
+    partial_path = f"{out_path}.partial"
+    with open(partial_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_COLUMNS, lineterminator="\n")
+        writer.writeheader()
+
+        def write_row(topic, top_keywords, input_news, result):
+            response, price, token_usage = result
+            writer.writerow({
+                "topic": topic,
+                "keyword": top_keywords,
+                "input_prompt": input_news,
+                "response": response,
+                "price": price,
+                "token_usage": token_usage,
+            })
+            f.flush()
+
+        yield write_row
+    os.replace(partial_path, out_path)
+
+# ``use_batch`` submits the prompts as one Batch API job, which is cheaper but
+# may take up to a day; otherwise they are sent as concurrent requests.
+def get_report(use_batch=False):
+    return asyncio.run(_get_report_async(use_batch))
+
+async def get_batch_rows(client, cache, df_topic, system_prompt):
+    topics = [topic for topic, _ in df_topic]
+    prepared = await asyncio.gather(*(asyncio.to_thread(prepare_topic, group) for _, group in df_topic))
+    results = {}
+    for _, input_news in prepared:
+        key = prompt_cache_key(system_prompt, input_news)
+        if key in cache:
+            results[input_news] = cache[key][1]
+    # Cached and repeated prompts are not submitted.
+    pending = [input_news for input_news in dict.fromkeys(input_news for _, input_news in prepared) if input_news not in results]
+    batch_results = await batch_api_call(client, "gpt4o", pending, system_prompt=system_prompt)
+    for input_news, result in zip(pending, batch_results):
+        results[input_news] = result
+        if result[0] is not None:
+            cache[prompt_cache_key(system_prompt, input_news)] = (time.time(), result)
+    return [
+        (topic, top_keywords, input_news, results[input_news])
+        for topic, (top_keywords, input_news) in zip(topics, prepared)
+    ]
 
-def get_report():
-    client = initialize_client()
+async def _get_report_async(use_batch=False):
     df = get_df()
-    df_report = pd.DataFrame(columns=["topic", "keyword", "input_prompt", "response", "price", "token_usage"])
     prompt = PROMPTS["REPORT_PROMPT"]
-    df_topic = df.groupby("topic")
-    df_dict = {}
-    for topic, group in df_topic:
-        input_news = ""
-        keywords = []
-        for index, row in group.iterrows():
-            input_news = input_news + row["ShortSummary"] + "\n"
-            keywords = keywords + [item.strip() for item in row["RelevantKeywords"].split(",")]
-        top_keywords = get_keywords_by_frequency(keywords)
-        input_news = f"{prompt}\n{input_news}"
-        response, price, token_usage = extract_information(client, input_news, prompt_type='REPORT_PROMPT')
-        df_dict["topic"] = topic
-        df_dict["keyword"] = top_keywords
-        df_dict["input_prompt"] = input_news
-        df_dict["response"] = response
-        df_dict["price"] = price
-        df_dict["token_usage"] = token_usage
-        df_report = pd.concat([df_report, pd.DataFrame.from_dict(df_dict)], ignore_index=True)
-    df_report.to_csv(f"{SAVE_DIR['CSV_DATA_DIR']}/df_report.csv", index=False)
+    df_topic = df.groupby("topic", observed=True, sort=False)
 
+    out_path = f"{SAVE_DIR['CSV_DATA_DIR']}/df_report.csv"
+    async with initialize_client() as client:
+        with open_prompt_cache() as cache:
+            if use_batch:
+                # Nothing is written until the batch has finished, which can
+                # take up to a day.
+                rows = await get_batch_rows(client, cache, df_topic, prompt)
+                with report_writer(out_path) as write_row:
+                    for row in rows:
+                        write_row(*row)
+            else:
+                # Each topic is prepared in a worker thread and its request sent
+                # as soon as it is ready, so the first requests are in flight
+                # while later topics are still being prepared.  Rows are written
+                # as their responses arrive; awaiting the tasks in turn keeps
+                # them in topic order.
+                semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+                tasks = [
+                    (topic, asyncio.ensure_future(prepare_and_extract(client, semaphore, cache, topic, group, prompt)))
+                    for topic, group in df_topic
+                ]
+                with report_writer(out_path) as write_row:
+                    for topic, task in tasks:
+                        write_row(topic, *await task)
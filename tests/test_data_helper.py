@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+
+from risklive.HKT.data_helper import DataHelper
+
+TEXTS = [
+    "see http://x.co/a\xa0nuclear plant",
+    "İstanbul nuclear plant",
+    "RT @user Sellafield decommissioning update",
+    "Café déjà vu #nuclear 2024",
+    "",
+]
+
+
+def test_tokenise_keeps_word_after_link_and_non_breaking_space():
+    helper = DataHelper()
+
+    assert helper.tokenise("see http://x.co/a\xa0nuclear plant") == ["see", "nuclear", "plant"]
+    assert helper.tokenise("İstanbul") == ["stanbul"]
+
+
+@pytest.mark.parametrize(
+    "dtype", [object, "string[python]", "string[pyarrow]", "large_string[pyarrow]"]
+)
+def test_tokenise_series_matches_tokenise(dtype):
+    if str(dtype).endswith("[pyarrow]"):
+        pytest.importorskip("pyarrow")
+    helper = DataHelper()
+    texts = pd.Series(TEXTS, dtype=dtype)
+
+    assert helper.tokenise_series(texts) == [helper.tokenise(text) for text in TEXTS]
+
+
+def test_load_sources_reads_multiline_text_across_blocks(tmp_path):
+    # Larger than one PyArrow read block, so quoted newlines straddle blocks.
+    csv_path = tmp_path / "dataset.csv"
+    rows = [
+        f'{i},"Sellafield update {i}\nnuclear {"x" * 200}\nend",{i % 4}\n'
+        for i in range(10_000)
+    ]
+    csv_path.write_text("sourceId,sourceText,categoryId\n" + "".join(rows))
+
+    sources = DataHelper(csv_path).load_sources()
+    chunked = DataHelper(csv_path, chunksize=1_000).load_sources()
+
+    assert len(sources) == 10_000
+    assert sources[9_999].text.startswith("Sellafield update 9999\nnuclear")
+    assert [(s.source_id, s.text, s.category_id, s.words) for s in sources.values()] == [
+        (s.source_id, s.text, s.category_id, s.words) for s in chunked.values()
+    ]
@@ -0,0 +1,224 @@
+import importlib
+import random
+import sys
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# The HKT modules import each other as top-level modules, as when the
+# Streamlit app is run from their directory.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "risklive" / "HKT"))
+
+import hkt_algorithm  # noqa: E402
+from data_helper import Source  # noqa: E402
+
+PARAMS = dict(
+    minimum_threshold_against_max_word_count=[0.0, 0.1, 0.3, 0.5, 0.9],
+    similarity_threshold=[0.0, 0.2, 0.5, 0.8, 1.0],
+    minimum_sources_important=[1, 1, 2, 3],
+    minimum_sources_branch=[1, 1, 2, 5],
+)
+
+
+def reference_build(
+    sources,
+    minimum_threshold_against_max_word_count,
+    similarity_threshold,
+    minimum_sources_important,
+    minimum_sources_branch,
+):
+    """Direct transcription of the original relation-list algorithm.
+
+    Works on the SourceWord relations as ``[word_id, source_id, count]``
+    rows and deletes consumed rows, like the C# code, so it shares no data
+    structures with :mod:`hkt_algorithm`.  Returns the same snapshot as
+    :func:`snapshot`.
+    """
+
+    word_counts = Counter()
+    for src in sources.values():
+        word_counts.update(set(src.words))
+    word_ids = {}
+    for word, count in word_counts.items():
+        if count >= minimum_sources_important:
+            word_ids[word] = len(word_ids) + 1
+
+    relations = [
+        [word_ids[word], src.source_id, word_counts[word]]
+        for src in sources.values()
+        for word in set(src.words)
+        if word in word_ids
+    ]
+    relations.sort(key=lambda rel: (-rel[2], rel[0]))
+
+    hkts = {}
+    nodes = {}
+
+    def new_node(hkt, word_ids_, source_ids):
+        node = {"node_id": len(nodes) + 1, "hkt_id": hkt["hkt_id"], "word_ids": set(word_ids_),
+                "source_ids": set(source_ids), "top_words": []}
+        nodes[node["node_id"]] = node
+        hkt["nodes"].append(node)
+        return node
+
+    def create_hkt(rows, parent_node_id):
+        maximum = rows[0][2]
+        expected = []
+        for word_id, _, count in rows:
+            if count / maximum < minimum_threshold_against_max_word_count:
+                break
+            if word_id not in expected:
+                expected.append(word_id)
+
+        hkt = {"hkt_id": len(hkts) + 1, "parent_node_id": parent_node_id,
+               "expected_words": expected, "nodes": []}
+        first_word_id = rows[0][0]
+        new_node(hkt, [first_word_id], {rel[1] for rel in rows if rel[0] == first_word_id})
+        rows[:] = [rel for rel in rows if rel[0] != first_word_id]
+        expected.remove(first_word_id)
+
+        for word_id in list(expected):
+            word_sources = {rel[1] for rel in rows if rel[0] == word_id}
+            best, best_ratio = None, None
+            for node in hkt["nodes"]:
+                if not node["source_ids"]:
+                    continue
+                ratio = len(node["source_ids"] & word_sources) / len(node["source_ids"])
+                if ratio >= similarity_threshold and (best is None or ratio > best_ratio):
+                    best, best_ratio = node, ratio
+            if best is not None:
+                best["word_ids"].add(word_id)
+                best["source_ids"] |= word_sources
+            else:
+                new_node(hkt, [word_id], word_sources)
+            rows[:] = [rel for rel in rows if rel[0] != word_id]
+
+        refugees = {rel[1] for rel in rows}
+        for node in hkt["nodes"]:
+            refugees -= node["source_ids"]
+        if refugees:
+            new_node(hkt, [-1], refugees)
+        return hkt
+
+    def create_branches(hkt, rows):
+        for node in list(hkt["nodes"]):
+            if len(node["source_ids"]) <= minimum_sources_branch:
+                continue
+            refuge = -1 in node["word_ids"]
+            sub = [list(rel) for rel in rows
+                   if rel[1] in node["source_ids"] and (refuge or rel[0] not in node["word_ids"])]
+            counts = Counter(rel[0] for rel in sub)
+            for rel in sub:
+                rel[2] = counts[rel[0]]
+            sub.sort(key=lambda rel: (-rel[2], rel[0]))
+            if not sub:
+                continue
+            if not refuge:
+                node["top_words"].extend(node["word_ids"])
+                for rel in sub:
+                    if rel[0] not in node["top_words"]:
+                        node["top_words"].append(rel[0])
+                    if len(node["top_words"]) >= 10:
+                        break
+            remaining = [list(rel) for rel in sub]
+            child = create_hkt(remaining, node["node_id"])
+            hkts[child["hkt_id"]] = child
+            if remaining:
+                create_branches(child, sub)
+
+    if relations:
+        root = create_hkt([list(rel) for rel in relations], 0)
+        hkts[root["hkt_id"]] = root
+        create_branches(root, relations)
+
+    stats = {
+        "number_loaded": len(sources),
+        "number_accepted_sources": len(sources),
+        "number_of_words": len(word_counts),
+        "update_source_word_relation_db": len(relations),
+        "number_of_hkts": len(hkts),
+        "number_of_nodes": len(nodes),
+    }
+    return (
+        [
+            (hkt_id, hkt["parent_node_id"], hkt["expected_words"],
+             [(n["node_id"], n["hkt_id"], sorted(n["word_ids"]), sorted(n["source_ids"]), n["top_words"])
+              for n in hkt["nodes"]])
+            for hkt_id, hkt in hkts.items()
+        ],
+        sorted(nodes),
+        stats,
+        {wid: word for word, wid in word_ids.items()},
+    )
+
+
+def snapshot(algo, hkts, stats):
+    return (
+        [
+            (hkt_id, hkt.parent_node_id, list(hkt.expected_words),
+             [(n.node_id, n.hkt_id, sorted(n.word_ids), sorted(n.source_ids), list(n.top_words))
+              for n in hkt.nodes])
+            for hkt_id, hkt in hkts.items()
+        ],
+        sorted(algo.nodeDS),
+        dict(stats),
+        dict(algo.wordDS),
+    )
+
+
+def random_case(seed):
+    rng = random.Random(seed)
+    params = {name: rng.choice(choices) for name, choices in PARAMS.items()}
+    vocab = rng.randint(3, 150)
+    words = [f"w{i}" for i in range(vocab)]
+    exponent = rng.choice([0.5, 1.0, 1.5])
+    weights = [1.0 / (i + 1) ** exponent for i in range(vocab)]
+    n = rng.randint(1, 80)
+    sources = {}
+    for source_id in rng.sample(range(1, 10 * n + 5), n):
+        k = rng.randint(0, rng.choice([3, 5, 8]))
+        sources[source_id] = Source(
+            source_id=source_id, text="", category_id=1, words=rng.choices(words, weights, k=k)
+        )
+    return sources, params
+
+
+def assert_matches_reference(seeds):
+    for seed in seeds:
+        sources, params = random_case(seed)
+        algo = hkt_algorithm.HKTAlgorithm(**params)
+        assert snapshot(algo, *algo.build(sources)) == reference_build(sources, **params), (seed, params)
+
+
+@pytest.fixture
+def lut_popcount(monkeypatch):
+    # NumPy < 2.0 has no bitwise_count; reload so the module takes its
+    # lookup-table fallback, then restore the real module afterwards.
+    monkeypatch.delattr(np, "bitwise_count", raising=False)
+    importlib.reload(hkt_algorithm)
+    yield
+    monkeypatch.undo()
+    importlib.reload(hkt_algorithm)
+
+
+def force_bitsets(monkeypatch):
+    monkeypatch.setattr(hkt_algorithm, "BITSET_MIN_NODES", 1)
+    monkeypatch.setattr(hkt_algorithm, "BITSET_MIN_NODE_SOURCES", 0)
+
+
+def test_build_matches_reference():
+    assert_matches_reference(range(600))
+
+
+def test_build_matches_reference_with_bitsets(monkeypatch):
+    force_bitsets(monkeypatch)
+    assert_matches_reference(range(1000, 1300))
+
+
+def test_build_matches_reference_with_lut_popcount(lut_popcount, monkeypatch):
+    assert hasattr(hkt_algorithm, "_POPCOUNT_TABLE")
+    force_bitsets(monkeypatch)
+    assert_matches_reference(range(2000, 2300))
+
@@ -0,0 +1,11 @@
+from types import SimpleNamespace
+
+import pytest
+
+lm = pytest.importorskip("risklive.topic_modeling.lm")
+
+
+def test_batch_pricing_applies_batch_discount():
+    usage = SimpleNamespace(prompt_tokens=1000, completion_tokens=500)
+
+    assert lm.pricing(usage, "gpt4o", batch=True) == pytest.approx(lm.pricing(usage, "gpt4o") / 2)
@@ -0,0 +1,125 @@
+import csv
+
+import pytest
+
+make_report = pytest.importorskip("risklive.topic_modeling.make_report")
+
+# As written by train_model.py, with the raw LLM response spanning lines.
+SOURCE_CSV = (
+    "AlertFlag,topic,ShortSummary,RelevantKeywords,response\n"
+    'Red,3,a,"k1, k2","first line\nsecond line"\n'
+    "Green,2,b,k3,r\n"
+    "Red,1,c,k1,r\n"
+    'Red,3,d," k2, k1,k2","one\n\ntwo"\n'
+    "Red,4,c,k1,r\n"
+)
+
+
+class FakeClient:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+@pytest.fixture
+def report_env(tmp_path, monkeypatch):
+    (tmp_path / "df_with_response_and_topics.csv").write_text(SOURCE_CSV)
+    monkeypatch.setattr(
+        make_report, "SAVE_DIR", {"CSV_DATA_DIR": tmp_path, "CACHE_DIR": tmp_path / "cache"}
+    )
+    monkeypatch.setattr(make_report, "PROMPTS", {"REPORT_PROMPT": "system"})
+    monkeypatch.setattr(make_report, "initialize_client", FakeClient)
+    return tmp_path
+
+
+def test_get_df_reads_multiline_cells_across_blocks(report_env):
+    # Larger than one PyArrow read block, so quoted newlines straddle blocks.
+    rows = [f'Red,{i % 7},summary {i},k{i % 3},"{"x" * 200}\nsecond line"\n' for i in range(10_000)]
+    (report_env / "df_with_response_and_topics.csv").write_text(
+        "AlertFlag,topic,ShortSummary,RelevantKeywords,response\n" + "".join(rows)
+    )
+
+    df = make_report.get_df()
+
+    assert len(df) == 10_000
+    assert df["ShortSummary"].iloc[-1] == "summary 9999"
+
+
+def test_batch_report_smoke(report_env, monkeypatch):
+    report_path = report_env / "df_report.csv"
+    report_path.write_text("previous report\n")
+    submitted = []
+    report_while_pending = []
+
+    async def fake_batch_api_call(client, model, user_prompts, system_prompt, **kwargs):
+        assert system_prompt == "system"
+        report_while_pending.append(report_path.read_text())
+        submitted.append(list(user_prompts))
+        return [(f"response {prompt.strip()}", 0.5, None) for prompt in user_prompts]
+
+    monkeypatch.setattr(make_report, "batch_api_call", fake_batch_api_call)
+
+    make_report.get_report(use_batch=True)
+
+    # The live report is left alone while the batch is pending.
+    assert report_while_pending == ["previous report\n"]
+    # Topics 1 and 4 share a prompt, which is only submitted once.
+    assert submitted == [["a\nd\n", "c\n"]]
+    with open(report_path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [(row["topic"], row["keyword"], row["response"]) for row in rows] == [
+        ("3", "k2, k1", "response a\nd"),
+        ("1", "k1", "response c"),
+        ("4", "k1", "response c"),
+    ]
+    assert not (report_env / "df_report.csv.partial").exists()
+
+    # A second run is served from the prompt cache.
+    make_report.get_report(use_batch=True)
+    assert submitted[1] == []
+    with open(report_path, newline="") as f:
+        assert [row["response"] for row in csv.DictReader(f)] == [
+            "response a\nd",
+            "response c",
+            "response c",
+        ]
+
+
+def test_interactive_report(report_env, monkeypatch):
+    report_path = report_env / "df_report.csv"
+    report_path.write_text("previous report\n")
+    calls = []
+
+    async def fake_api_call(client, model, user_prompt, system_prompt):
+        assert system_prompt == "system"
+        calls.append(user_prompt)
+        if user_prompt == "a\nd\n" and calls.count(user_prompt) == 1:
+            raise ValueError("bad request")
+        return f"response {user_prompt.strip()}", 0.5, None
+
+    monkeypatch.setattr(make_report, "api_call", fake_api_call)
+
+    make_report.get_report()
+
+    # Topic 3 failed and is written with empty fields; the others still succeed.
+    with open(report_path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [(row["topic"], row["keyword"], row["response"], row["price"]) for row in rows] == [
+        ("3", "k2, k1", "", ""),
+        ("1", "k1", "response c", "0.5"),
+        ("4", "k1", "response c", "0.5"),
+    ]
+    assert not (report_env / "df_report.csv.partial").exists()
+
+    # Only the failed prompt is requested again; the rest come from the cache.
+    first_run_calls = len(calls)
+    make_report.get_report()
+    assert calls[first_run_calls:] == ["a\nd\n"]
+    with open(report_path, newline="") as f:
+        assert [row["response"] for row in csv.DictReader(f)] == [
+            "response a\nd",
+            "response c",
+            "response c",
+        ]